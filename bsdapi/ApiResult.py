@@ -13,6 +13,8 @@
 # limitations under the License.
 #
 
+import codecs
+import csv
 import json
 
 
@@ -33,10 +35,13 @@ class ApiResultPrettyPrintable:
 
         ''' assume json response body and try to prettyprint, just print plain
         response if fail'''
-        try:
-            body_str = json.dumps(json.loads(apiResult.body), sort_keys=True, indent=4)
-        except:
-            body_str = apiResult.body
+        if apiResult.body is None:
+            body_str = '(streamed body)'
+        else:
+            try:
+                body_str = json.dumps(json.loads(apiResult.body), sort_keys=True, indent=4)
+            except:
+                body_str = apiResult.body
 
         full_str = "%s\n%s\n%s" % (self.styler.color(status_str, color),
                                    self.styler.color(headers_str, 'purple'),
@@ -57,6 +62,50 @@ class ApiResult:
         self.http_reason = http_response.reason
         self.http_version = 'HTTP/1.1'
 
+    def iterContent(self, chunkSize=65536):
+        """
+        Yield the raw response body as byte chunks.  For streamed calls the body is read from the connection as it
+        is consumed, so it is never held in memory as a whole.
+        """
+        return self.http_response.iter_content(chunk_size=chunkSize)
+
+    def iterLines(self, encoding=None, chunkSize=65536):
+        """Yield the decoded body line by line, keeping line endings"""
+        decoder = codecs.getincrementaldecoder(encoding or self.http_response.encoding or 'utf-8')('replace')
+        pending = ''
+        for chunk in self.iterContent(chunkSize):
+            pending += decoder.decode(chunk)
+            lines = pending.splitlines(True)
+            # The last piece may be a partial line (or a \r whose \n is in the next chunk)
+            pending = lines.pop() if lines else ''
+            for line in lines:
+                yield line
+        pending += decoder.decode(b'', True)
+        for line in pending.splitlines(True):
+            yield line
+
+    def iterRows(self, encoding=None, **fmtparams):
+        """Yield the body parsed as CSV, one list of fields per row"""
+        return csv.reader(self.iterLines(encoding), **fmtparams)
+
+    def saveTo(self, destination, chunkSize=65536):
+        """Write the raw body to a file path or binary file object and return the number of bytes written"""
+        if hasattr(destination, 'write'):
+            return self._copyTo(destination, chunkSize)
+        with open(destination, 'wb') as fileObject:
+            return self._copyTo(fileObject, chunkSize)
+
+    def _copyTo(self, fileObject, chunkSize):
+        written = 0
+        for chunk in self.iterContent(chunkSize):
+            fileObject.write(chunk)
+            written += len(chunk)
+        return written
+
+    def close(self):
+        """Release the connection of a streamed call that was not read to the end"""
+        self.http_response.close()
+
     def __str__(self):
         if self.stringizer:
             return self.stringizer.toString(self)
@@ -0,0 +1,81 @@
+# Copyright 2013 Blue State Digital
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from bsdapi.BsdApi import BsdApi
+from bsdapi.BsdApi import Factory as BsdApiFactory
+
+
+class AsyncBsdApi:
+    """
+    Awaitable counterpart of BsdApi.
+
+    Every public BsdApi method is available under the same name and returns a coroutine.  Calls are signed and
+    turned into ApiResult objects by the wrapped BsdApi and run on a dedicated pool of worker threads sharing its
+    pooled session, so the event loop is never blocked and up to maxWorkers calls can be in flight at once.
+    """
+    GET = BsdApi.GET
+    POST = BsdApi.POST
+
+    def __init__(self, api, maxWorkers=100):
+        self.api = api
+        self.executor = ThreadPoolExecutor(max_workers=maxWorkers)
+
+    async def _call(self, name, *args, **kwargs):
+        loop = asyncio.get_event_loop()
+        call = functools.partial(getattr(self.api, name), *args, **kwargs)
+        return await loop.run_in_executor(self.executor, call)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.api.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self.close)
+
+
+def _awaitable(name):
+    method = getattr(BsdApi, name)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return self._call(name, *args, **kwargs)
+
+    return wrapper
+
+
+_NOT_MIRRORED = ('close',)
+
+for _name, _method in list(vars(BsdApi).items()):
+    if not _name.startswith('_') and callable(_method) and _name not in _NOT_MIRRORED:
+        setattr(AsyncBsdApi, _name, _awaitable(_name))
+
+
+class Factory:
+    def __init__(self):
+        pass
+
+    def create(self, api_id, secret, host, port, securePort, colorize=False, httpUsername=None, httpPassword=None,
+               verbose=False, encoding=None, maxConcurrency=100):
+        api = BsdApiFactory().create(api_id, secret, host, port, securePort, colorize, httpUsername, httpPassword,
+                                     verbose, encoding, poolMaxSize=maxConcurrency)
+        return AsyncBsdApi(api, maxConcurrency)
@@ -19,6 +19,12 @@ from bsdapi.RequestGenerator import RequestGenerator
 from bsdapi.Styler import Factory as StylerFactory
 from bsdapi.ApiResult import FactoryFactory as ApiResultFactoryFactory
 from bsdapi.ApiResult import ApiResultPrettyPrintable
+from bsdapi.ApiResult import ApiResult
+from bsdapi.Deferred import DeferredPoller
+from bsdapi.Deferred import deferredId
+from bsdapi.Chunking import Chunker
+from bsdapi.Chunking import sendChunked
+from bsdapi.Session import Factory as SessionFactory
 
 import requests
 import base64
@@ -29,7 +35,8 @@ class BsdApi:
     POST = 'POST'
 
     def __init__(self, apiId, apiSecret, apiHost, apiResultFactory, apiPort=80, apiSecurePort=443, httpUsername=None,
-                 httpPassword=None, verbose=False, encoding=None):
+                 httpPassword=None, verbose=False, encoding=None, session=None, ownsSession=None,
+                 chunkSize=None, chunkBytes=None, chunkWorkers=1):
         self.apiId = apiId
         self.apiSecret = apiSecret
         self.apiHost = apiHost
@@ -41,14 +48,51 @@ class BsdApi:
         self.verbose = verbose
         self.encoding = encoding
 
+        # A session handed in by the caller may be shared, so by default only close the one we built ourselves
+        self.ownsSession = (session is None) if ownsSession is None else ownsSession
+        self.session = session if session is not None else SessionFactory().create()
+        self.deferredPoller = DeferredPoller(self)
+
+        # Long id lists are split into several calls once they exceed chunkSize ids or chunkBytes encoded bytes
+        self.chunker = Chunker(chunkSize, chunkBytes)
+        self.chunkWorkers = chunkWorkers
+
+    def close(self):
+        self.deferredPoller.close()
+        if self.ownsSession and self.session is not None:
+            self.session.close()
+        self.session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     """
         ***** General *****
     """
 
-    def getDeferredResults(self, deferred_id):
+    def getDeferredResults(self, deferred_id, stream=False):
         query = {'deferred_id': deferred_id}
         url_secure = self._generateRequest('/get_deferred_results', query)
-        return self._makeGETRequest(url_secure)
+        return self._makeGETRequest(url_secure, stream=stream)
+
+    def waitForDeferredResults(self, deferred, timeout=None, stream=False):
+        """
+        Poll get_deferred_results until the result is ready and return it.
+
+        deferred is either a deferred id or the ApiResult of the call that was deferred; a result that was not
+        deferred is returned as-is.  Raises DeferredTimeoutError if timeout seconds pass first.  With stream set the
+        ready result's body is left unread, see ApiResult.iterContent().
+        """
+        if isinstance(deferred, ApiResult):
+            deferred_id = deferredId(deferred)
+            if deferred_id is None:
+                return deferred
+        else:
+            deferred_id = deferred
+        return self.deferredPoller.wait(deferred_id, timeout, stream)
 
     def doRequest(self, api_call, api_params=None, request_type=GET, body=None, headers=None, https=True):
         url = self._generateRequest(api_call, api_params, https)
@@ -58,9 +102,10 @@ class BsdApi:
         else:
             return self._makePOSTRequest(url, body, https)
 
-    def doRawRequest(self, api_call, api_params=None, request_type=GET, body=None, headers=None, https=True):
+    def doRawRequest(self, api_call, api_params=None, request_type=GET, body=None, headers=None, https=True,
+                     stream=False):
         url = self._generateRequest(api_call, api_params, https)
-        return self._makeRequest(url, request_type, body, headers, https)
+        return self._makeRequest(url, request_type, body, headers, https, stream)
 
     """
         ***** Account *****
@@ -101,28 +146,34 @@ class BsdApi:
 
     def cons_getConstituentsById(self, cons_ids, request_filter=None, bundles=None):
         """Retrieves constituents by ID """
-        query = {'cons_ids': ','.join([str(elem) for elem in cons_ids])}
+        def send(chunk):
+            query = {'cons_ids': chunk}
 
-        if request_filter:
-            query['filter'] = str(Filters(request_filter))
+            if request_filter:
+                query['filter'] = str(Filters(request_filter))
 
-        if bundles:
-            query['bundles'] = str(Bundles(bundles))
+            if bundles:
+                query['bundles'] = str(Bundles(bundles))
 
-        url_secure = self._generateRequest('/cons/get_constituents_by_id', query)
-        return self._makeGETRequest(url_secure)
+            url_secure = self._generateRequest('/cons/get_constituents_by_id', query)
+            return self._makeGETRequest(url_secure)
+
+        return self._sendChunked(cons_ids, send)
 
     def cons_getConstituentsByExtId(self, ext_type, ext_ids, request_filter=None, bundles=None):
-        query = {'ext_type': ext_type, 'ext_ids': ','.join([str(elem) for elem in ext_ids])}
+        def send(chunk):
+            query = {'ext_type': ext_type, 'ext_ids': chunk}
 
-        if request_filter:
-            query['filter'] = str(Filters(request_filter))
+            if request_filter:
+                query['filter'] = str(Filters(request_filter))
 
-        if bundles:
-            query['bundles'] = str(Bundles(bundles))
+            if bundles:
+                query['bundles'] = str(Bundles(bundles))
 
-        url_secure = self._generateRequest('/cons/get_constituents_by_ext_id', query)
-        return self._makeGETRequest(url_secure)
+            url_secure = self._generateRequest('/cons/get_constituents_by_ext_id', query)
+            return self._makeGETRequest(url_secure)
+
+        return self._sendChunked(ext_ids, send)
 
     def cons_getUpdatedConstituents(self, changed_since, request_filter=None, bundles=None):
         query = {'changed_since': str(changed_since)}
@@ -150,9 +201,12 @@ class BsdApi:
         return self._makePOSTRequest(url_secure, query)
 
     def cons_deleteConstituentsById(self, cons_ids):
-        query = {'cons_ids': ','.join([str(cons) for cons in cons_ids])}
-        url_secure = self._generateRequest('/cons/delete_constituents_by_id')
-        return self._makePOSTRequest(url_secure, query)
+        def send(chunk):
+            query = {'cons_ids': chunk}
+            url_secure = self._generateRequest('/cons/delete_constituents_by_id')
+            return self._makePOSTRequest(url_secure, query)
+
+        return self._sendChunked(cons_ids, send)
 
     def cons_getBulkConstituentData(self, request_format, fields, cons_ids=None, request_filter=None):
         query = {'format': str(request_format), 'fields': ','.join([str(field) for field in fields])}
@@ -266,11 +320,14 @@ class BsdApi:
         return self._makePOSTRequest(url_secure, query)
 
     def cons_group_addConsIdsToGroup(self, cons_group_id, cons_ids):
-        query = {'cons_group_id': str(cons_group_id),
-                 'cons_ids': ','.join([str(cons) for cons in cons_ids])}
+        def send(chunk):
+            query = {'cons_group_id': str(cons_group_id),
+                     'cons_ids': chunk}
 
-        url_secure = self._generateRequest('/cons_group/add_cons_ids_to_group')
-        return self._makePOSTRequest(url_secure, query)
+            url_secure = self._generateRequest('/cons_group/add_cons_ids_to_group')
+            return self._makePOSTRequest(url_secure, query)
+
+        return self._sendChunked(cons_ids, send)
 
     def cons_group_setConsIdsForGroup(self, cons_group_id, cons_ids):
         query = {'cons_group_id': str(cons_group_id),
@@ -280,27 +337,36 @@ class BsdApi:
         return self._makePOSTRequest(url_secure, query)
 
     def cons_group_addExtIdsToGroup(self, cons_group_id, ext_type, ext_ids):
-        query = {'cons_group_id': str(cons_group_id),
-                 'ext_type': ext_type,
-                 'ext_ids': ','.join([str(ext) for ext in ext_ids])}
+        def send(chunk):
+            query = {'cons_group_id': str(cons_group_id),
+                     'ext_type': ext_type,
+                     'ext_ids': chunk}
 
-        url_secure = self._generateRequest('/cons_group/add_ext_ids_to_group')
-        return self._makePOSTRequest(url_secure, query)
+            url_secure = self._generateRequest('/cons_group/add_ext_ids_to_group')
+            return self._makePOSTRequest(url_secure, query)
+
+        return self._sendChunked(ext_ids, send)
 
     def cons_group_removeConsIdsFromGroup(self, cons_group_id, cons_ids):
-        query = {'cons_group_id': str(cons_group_id),
-                 'cons_ids': ','.join([str(cons) for cons in cons_ids])}
+        def send(chunk):
+            query = {'cons_group_id': str(cons_group_id),
+                     'cons_ids': chunk}
 
-        url_secure = self._generateRequest('/cons_group/remove_cons_ids_from_group')
-        return self._makePOSTRequest(url_secure, query)
+            url_secure = self._generateRequest('/cons_group/remove_cons_ids_from_group')
+            return self._makePOSTRequest(url_secure, query)
+
+        return self._sendChunked(cons_ids, send)
 
     def cons_group_removeExtIdsFromGroup(self, cons_group_id, ext_type, ext_ids):
-        query = {'cons_group_id': str(cons_group_id),
-                 'ext_type': ext_type,
-                 'ext_ids': ','.join([str(ext) for ext in ext_ids])}
+        def send(chunk):
+            query = {'cons_group_id': str(cons_group_id),
+                     'ext_type': ext_type,
+                     'ext_ids': chunk}
 
-        url_secure = self._generateRequest('/cons_group/remove_ext_ids_from_group')
-        return self._makePOSTRequest(url_secure, query)
+            url_secure = self._generateRequest('/cons_group/remove_ext_ids_from_group')
+            return self._makePOSTRequest(url_secure, query)
+
+        return self._sendChunked(ext_ids, send)
 
     """
         ***** Contribution *****
@@ -410,7 +476,7 @@ class BsdApi:
         ***** Internal/Helpers *****
     """
 
-    def _makeRequest(self, url_secure, request_type, http_body=None, headers=None, https=True):
+    def _makeRequest(self, url_secure, request_type, http_body=None, headers=None, https=True, stream=False):
         if self.apiPort == 443:
             https = True
         # TODO: support nonstandard ports?  We block them on Akamai anyway.
@@ -434,10 +500,14 @@ class BsdApi:
             print("\n%s\n\n----\n" % http_body)
 
         try:
-            response = requests.request(request_type, composite_url, data=http_body, headers=headers, verify=True)
+            response = self.session.request(request_type, composite_url, data=http_body, headers=headers, verify=True,
+                                            stream=stream)
 
             headers = response.headers
-            if self.encoding:
+            if stream:
+                # Left unread; the caller consumes it through ApiResult.iterContent() and friends
+                body = None
+            elif self.encoding:
                 body = response.text.encode(self.encoding)
             else:
                 body = response.text
@@ -449,6 +519,9 @@ class BsdApi:
             print(error)
             print("Error calling " + url_secure.getPathAndQuery())
 
+    def _sendChunked(self, ids, send):
+        return sendChunked(self.chunker, ids, send, self.chunkWorkers)
+
     def _generateRequest(self, api_call, api_params=None, https=True):
         if api_params is None:
             api_params = {}
@@ -467,8 +540,8 @@ class BsdApi:
         url_secure = request.getUrl(api_call, api_params)
         return url_secure
 
-    def _makeGETRequest(self, url_secure, https=True):
-        return self._makeRequest(url_secure, BsdApi.GET, https=https)
+    def _makeGETRequest(self, url_secure, https=True, stream=False):
+        return self._makeRequest(url_secure, BsdApi.GET, https=https, stream=stream)
 
     def _makePOSTRequest(self, url_secure, body=None, https=True):
         headers = {"Content-type": "application/x-www-form-urlencoded",
@@ -481,8 +554,11 @@ class Factory:
         pass
 
     def create(self, api_id, secret, host, port, securePort, colorize=False, httpUsername=None, httpPassword=None,
-               verbose=False, encoding=None):
+               verbose=False, encoding=None, poolConnections=10, poolMaxSize=10, poolBlock=False, maxRetries=0,
+               keepAlive=True, chunkSize=None, chunkBytes=None, chunkWorkers=1):
         styler = StylerFactory().create(colorize)
         apiResultFactory = ApiResultFactoryFactory().create(ApiResultPrettyPrintable(styler))
+        session = SessionFactory().create(poolConnections, poolMaxSize, poolBlock, maxRetries, keepAlive)
         return BsdApi(api_id, secret, host, apiResultFactory, port, securePort, httpUsername, httpPassword, verbose,
-                      encoding)
+                      encoding, session, ownsSession=True, chunkSize=chunkSize, chunkBytes=chunkBytes,
+                      chunkWorkers=chunkWorkers)
@@ -0,0 +1,125 @@
+# Copyright 2013 Blue State Digital
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from concurrent.futures import ThreadPoolExecutor
+from xml.etree import ElementTree
+
+try:
+    import urllib.parse
+    urlQuoteFunc = urllib.parse.quote
+except ImportError:
+    import urllib
+    urlQuoteFunc = urllib.quote
+
+
+class Chunker:
+    """
+    Splits a list of ids into comma-joined chunks holding at most maxCount ids and at most maxBytes bytes once
+    URL-encoded.  Either limit may be None; with neither set everything goes out in a single chunk.
+    """
+
+    def __init__(self, maxCount=None, maxBytes=None):
+        self.maxCount = maxCount
+        self.maxBytes = maxBytes
+
+    def split(self, ids):
+        chunk = []
+        size = 0
+        for value in ids:
+            value = str(value)
+            # Every id after the first also costs an encoded comma (%2C)
+            cost = len(urlQuoteFunc(value)) + (3 if chunk else 0)
+            if chunk and ((self.maxCount and len(chunk) >= self.maxCount) or
+                          (self.maxBytes and size + cost > self.maxBytes)):
+                yield ','.join(chunk)
+                chunk = []
+                size = 0
+                cost = len(urlQuoteFunc(value))
+            chunk.append(value)
+            size += cost
+
+        if chunk:
+            yield ','.join(chunk)
+
+
+class ChunkedApiResult:
+    """
+    Merged outcome of a call that was split into several requests.  results holds one (chunk, ApiResult) pair per
+    request in order; http_status is 200 when every chunk succeeded, otherwise the status of the first failure.
+    """
+
+    def __init__(self, results):
+        self.results = results
+        self._body = None
+
+        self.http_status = 200
+        for chunk, result in results:
+            if result is None:
+                self.http_status = None
+                break
+            if not 200 <= result.http_status < 300:
+                self.http_status = result.http_status
+                break
+
+    @property
+    def ok(self):
+        return self.http_status == 200
+
+    def failed(self):
+        return [(chunk, result) for chunk, result in self.results
+                if result is None or not 200 <= result.http_status < 300]
+
+    @property
+    def body(self):
+        """The chunk bodies merged into one <api> document when they are XML, otherwise concatenated"""
+        if self._body is None:
+            bodies = [result.body for _, result in self.results if result is not None]
+            self._body = _mergeXml(bodies)
+        return self._body
+
+    def __str__(self):
+        return '\n'.join(str(result) for _, result in self.results)
+
+
+def _mergeXml(bodies):
+    try:
+        roots = [ElementTree.fromstring(body) for body in bodies if body]
+    except ElementTree.ParseError:
+        return '\n'.join(body.decode('utf-8') if isinstance(body, bytes) else body for body in bodies)
+
+    if not roots:
+        return ''
+    merged = roots[0]
+    for root in roots[1:]:
+        merged.extend(list(root))
+    return ElementTree.tostring(merged, encoding='unicode')
+
+
+def sendChunked(chunker, ids, send, workers=1):
+    """
+    Call send once per chunk of ids.  A single chunk returns send's ApiResult unchanged; several chunks are
+    dispatched on up to workers threads and returned as a ChunkedApiResult.
+    """
+    chunks = list(chunker.split(ids)) or ['']
+    if len(chunks) == 1:
+        return send(chunks[0])
+
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(send, chunks))
+    else:
+        results = [send(chunk) for chunk in chunks]
+
+    return ChunkedApiResult(list(zip(chunks, results)))
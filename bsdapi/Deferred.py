@@ -0,0 +1,185 @@
+# Copyright 2013 Blue State Digital
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+# get_deferred_results answers 503 until the result is ready; 202 is what the original call returns
+PENDING_STATUSES = (202, 503)
+
+
+class DeferredTimeoutError(Exception):
+    def __init__(self, deferred_id, result=None):
+        Exception.__init__(self, 'Deferred result %s was not ready before the deadline' % deferred_id)
+        self.deferred_id = deferred_id
+        self.result = result
+
+
+class Backoff:
+    """
+    Capped exponential backoff with jitter.  A Retry-After hint from the server takes precedence over the
+    computed delay but is still capped.
+    """
+
+    def __init__(self, initial=1.0, maximum=60.0, multiplier=2.0, jitter=0.5):
+        self.initial = initial
+        self.maximum = maximum
+        self.multiplier = multiplier
+        self.jitter = jitter
+
+    def delay(self, attempt, hint=None):
+        if hint is not None:
+            return min(hint, self.maximum)
+        delay = min(self.maximum, self.initial * (self.multiplier ** attempt))
+        return delay * (1 - self.jitter * random.random())
+
+
+def retryAfter(apiResult):
+    """Seconds to wait as hinted by a Retry-After header, or None"""
+    if apiResult is None or apiResult.headers is None:
+        return None
+    try:
+        return max(0.0, float(apiResult.headers.get('Retry-After')))
+    except (TypeError, ValueError):
+        return None
+
+
+def deferredId(apiResult):
+    """The deferred id carried by a 202 response, or None if the result is not deferred"""
+    if apiResult is None or apiResult.http_status != 202:
+        return None
+    body = apiResult.body
+    if isinstance(body, bytes):
+        body = body.decode('utf-8')
+    return body.strip() or None
+
+
+class _Job:
+    def __init__(self, deferred_id, future, deadline, stream=False):
+        self.deferred_id = deferred_id
+        self.stream = stream
+        self.future = future
+        self.deadline = deadline
+        self.attempt = 0
+        self.result = None
+
+
+class DeferredPoller:
+    """
+    Polls get_deferred_results for any number of outstanding deferred ids from a single scheduler thread.
+
+    Each submitted id gets its own backoff schedule and optional deadline; the thread sleeps until the next id is
+    due, so many ids can be tracked without one thread (or tight loop) per id.
+    """
+
+    def __init__(self, api, backoff=None, timeout=None):
+        self.api = api
+        self.backoff = backoff if backoff is not None else Backoff()
+        self.timeout = timeout
+
+        self.queue = []
+        self.counter = itertools.count()
+        self.condition = threading.Condition()
+        self.thread = None
+        self.closed = False
+
+    def submit(self, deferred_id, timeout=None, stream=False):
+        """Start tracking deferred_id and return a Future resolved with its ApiResult"""
+        if timeout is None:
+            timeout = self.timeout
+
+        future = Future()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        job = _Job(str(deferred_id), future, deadline, stream)
+
+        with self.condition:
+            if self.closed:
+                raise RuntimeError('DeferredPoller is closed')
+            self._schedule(job, time.monotonic())
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name='bsdapi-deferred-poller')
+                self.thread.daemon = True
+                self.thread.start()
+            self.condition.notify()
+
+        return future
+
+    def wait(self, deferred_id, timeout=None, stream=False):
+        return self.submit(deferred_id, timeout, stream).result()
+
+    def pending(self):
+        with self.condition:
+            return len(self.queue)
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            jobs = [job for _, _, job in self.queue]
+            self.queue = []
+            self.condition.notify()
+        for job in jobs:
+            job.future.cancel()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+
+    def _schedule(self, job, when):
+        heapq.heappush(self.queue, (when, next(self.counter), job))
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.closed and (not self.queue or self.queue[0][0] > time.monotonic()):
+                    self.condition.wait(self.queue[0][0] - time.monotonic() if self.queue else None)
+                if self.closed:
+                    return
+                _, _, job = heapq.heappop(self.queue)
+
+            self._poll(job)
+
+    def _poll(self, job):
+        if job.future.cancelled():
+            return
+
+        try:
+            job.result = self.api.getDeferredResults(job.deferred_id, stream=job.stream)
+        except Exception as error:
+            job.future.set_exception(error)
+            return
+
+        if job.result is not None and job.result.http_status not in PENDING_STATUSES:
+            job.future.set_result(job.result)
+            return
+        if job.stream and job.result is not None:
+            job.result.close()
+
+        now = time.monotonic()
+        when = now + self.backoff.delay(job.attempt, retryAfter(job.result))
+        job.attempt += 1
+
+        if job.deadline is not None and now >= job.deadline:
+            job.future.set_exception(DeferredTimeoutError(job.deferred_id, job.result))
+            return
+        if job.deadline is not None:
+            when = min(when, job.deadline)
+
+        with self.condition:
+            if self.closed:
+                job.future.cancel()
+                return
+            self._schedule(job, when)
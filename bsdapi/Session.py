@@ -0,0 +1,41 @@
+# Copyright 2013 Blue State Digital
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class Factory:
+    def __init__(self):
+        pass
+
+    def create(self, poolConnections=10, poolMaxSize=10, poolBlock=False, maxRetries=0, keepAlive=True):
+        """
+        Build a requests Session backed by a pooled HTTPAdapter.
+
+        poolConnections is the number of per-host pools to keep, poolMaxSize the number of keep-alive connections
+        kept per host and poolBlock whether callers wait for a free connection instead of opening an extra one.
+        maxRetries is handed to the adapter (an int or a urllib3 Retry) and only covers connection-level failures.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=poolConnections, pool_maxsize=poolMaxSize, pool_block=poolBlock,
+                              max_retries=maxRetries)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+
+        if not keepAlive:
+            session.headers['Connection'] = 'close'
+
+        return session
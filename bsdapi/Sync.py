@@ -0,0 +1,155 @@
+# Copyright 2013 Blue State Digital
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import json
+import os
+import sqlite3
+import time
+from xml.etree import ElementTree
+
+from bsdapi.Deferred import deferredId
+
+
+class SyncError(Exception):
+    def __init__(self, message, result=None):
+        Exception.__init__(self, message)
+        self.result = result
+
+
+class FileCheckpoint:
+    """Keeps sync state as JSON in a file, replaced atomically on every save"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        try:
+            with open(self.path) as fileObject:
+                return json.load(fileObject)
+        except (IOError, OSError):
+            return {}
+
+    def save(self, state):
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w') as fileObject:
+            json.dump(state, fileObject)
+        os.replace(temporary, self.path)
+
+
+class SqliteCheckpoint:
+    """Keeps sync state in a SQLite database, one row per named sync"""
+
+    def __init__(self, path, name='default'):
+        self.path = path
+        self.name = name
+
+        with self._connect() as connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS bsdapi_checkpoint (name TEXT PRIMARY KEY, state TEXT)')
+
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def load(self):
+        connection = self._connect()
+        try:
+            row = connection.execute('SELECT state FROM bsdapi_checkpoint WHERE name = ?', (self.name,)).fetchone()
+        finally:
+            connection.close()
+        return json.loads(row[0]) if row else {}
+
+    def save(self, state):
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute('INSERT OR REPLACE INTO bsdapi_checkpoint (name, state) VALUES (?, ?)',
+                                   (self.name, json.dumps(state)))
+        finally:
+            connection.close()
+
+
+class ConstituentSync:
+    """
+    Incremental pull of changed constituents built on cons_getUpdatedConstituents.
+
+    The checkpoint holds the high-water mark (the time the last complete pull was requested) and, while a pull is
+    in progress, its deferred id, so an interrupted run picks up the same deferred result instead of requesting a
+    new one.  The mark only moves once every record has been consumed, so delivery is at-least-once: records of
+    an interrupted run are delivered again.
+    """
+
+    def __init__(self, api, checkpoint, request_filter=None, bundles=None, since=0, timeout=None):
+        self.api = api
+        self.checkpoint = checkpoint
+        self.request_filter = request_filter
+        self.bundles = bundles
+        self.since = since
+        self.timeout = timeout
+
+    def run(self):
+        """Yield an ElementTree element for every <cons> changed since the last completed run"""
+        state = self.checkpoint.load()
+        result = self._resume(state)
+
+        if result is None:
+            state['pending'] = {'started_at': int(time.time())}
+            result = self.api.cons_getUpdatedConstituents(state.get('changed_since', self.since),
+                                                          self.request_filter, self.bundles)
+            if result is None:
+                raise SyncError('Could not request updated constituents')
+
+            deferred_id = deferredId(result)
+            if deferred_id is not None:
+                state['pending']['deferred_id'] = deferred_id
+                self.checkpoint.save(state)
+                result = self.api.waitForDeferredResults(deferred_id, self.timeout, stream=True)
+
+        if result.http_status != 200:
+            raise SyncError('Updated constituents request failed with HTTP %s' % result.http_status, result)
+
+        for element in self._iterCons(result):
+            yield element
+
+        self.checkpoint.save({'changed_since': state['pending']['started_at']})
+
+    def _resume(self, state):
+        pending = state.get('pending')
+        if not pending or 'deferred_id' not in pending:
+            return None
+
+        result = self.api.waitForDeferredResults(pending['deferred_id'], self.timeout, stream=True)
+        if result is not None and result.http_status == 200:
+            return result
+
+        # The deferred result expired or was lost; start over from the same mark
+        if result is not None:
+            result.close()
+        del state['pending']
+        return None
+
+    def _iterCons(self, result):
+        parser = ElementTree.XMLPullParser(events=('start', 'end'))
+        stack = []
+        for chunk in result.iterContent():
+            parser.feed(chunk)
+            for event, element in parser.read_events():
+                if event == 'start':
+                    stack.append(element)
+                    continue
+                stack.pop()
+                if element.tag == 'cons' and len(stack) == 1:
+                    # Detach the record from the document so memory stays flat however large the result is
+                    stack[0].remove(element)
+                    yield element
+        parser.close()
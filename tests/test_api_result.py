@@ -0,0 +1,79 @@
+import io
+import requests_mock
+import pytest
+from bsdapi.BsdApi import Factory
+
+API_ID = 'my-id'
+API_SECRET = 'my-secret'
+API_HOST = 'my.client'
+DEFERRED_URL = 'https://my.client/page/api/get_deferred_results'
+CSV_BODY = b'cons_id,firstname\r\n1,Ann\r\n2,"Multi\nLine"\r\n3,J\xc3\xbcrgen\r\n'
+
+
+@pytest.fixture
+def api_client():
+    """
+    :return: BsdApi
+    """
+    client = Factory().create(API_ID, API_SECRET, API_HOST, 80, 443)
+    yield client
+    client.close()
+
+
+def test_streamed_result_leaves_body_unread(api_client):
+    with requests_mock.Mocker() as m:
+        m.register_uri('GET', DEFERRED_URL, content=CSV_BODY)
+        result = api_client.getDeferredResults('abc', stream=True)
+
+        assert result.body is None
+        assert b''.join(result.iterContent(chunkSize=4)) == CSV_BODY
+
+
+def test_iter_rows_parses_csv_across_chunks(api_client):
+    with requests_mock.Mocker() as m:
+        m.register_uri('GET', DEFERRED_URL, content=CSV_BODY, headers={'Content-Type': 'text/csv; charset=utf-8'})
+        result = api_client.getDeferredResults('abc', stream=True)
+
+        rows = list(result.iterRows())
+
+    assert rows == [['cons_id', 'firstname'], ['1', 'Ann'], ['2', 'Multi\nLine'], ['3', 'Jürgen']]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1024])
+def test_iter_lines_keeps_split_line_endings(api_client, chunk_size):
+    with requests_mock.Mocker() as m:
+        m.register_uri('GET', DEFERRED_URL, content=b'a\r\nb\r\n\xc3\xbc')
+        result = api_client.getDeferredResults('abc', stream=True)
+
+        assert list(result.iterLines('utf-8', chunkSize=chunk_size)) == ['a\r\n', 'b\r\n', 'ü']
+
+
+def test_save_to_file_object(api_client):
+    with requests_mock.Mocker() as m:
+        m.register_uri('GET', DEFERRED_URL, content=CSV_BODY)
+        destination = io.BytesIO()
+
+        written = api_client.getDeferredResults('abc', stream=True).saveTo(destination)
+
+    assert written == len(CSV_BODY)
+    assert destination.getvalue() == CSV_BODY
+
+
+def test_save_to_path(api_client, tmpdir):
+    path = str(tmpdir.join('export.csv'))
+    with requests_mock.Mocker() as m:
+        m.register_uri('GET', DEFERRED_URL, content=CSV_BODY)
+        api_client.getDeferredResults('abc', stream=True).saveTo(path)
+
+    with open(path, 'rb') as saved:
+        assert saved.read() == CSV_BODY
+
+
+def test_wait_for_deferred_results_streams_ready_result(api_client):
+    api_client.deferredPoller.backoff.initial = 0.001
+    with requests_mock.Mocker() as m:
+        m.register_uri('GET', DEFERRED_URL, [{'status_code': 503}, {'content': CSV_BODY}])
+        result = api_client.waitForDeferredResults('abc', stream=True)
+
+        assert result.body is None
+        assert len(list(result.iterRows())) == 4
@@ -0,0 +1,65 @@
+import asyncio
+import requests_mock
+from bsdapi.AsyncBsdApi import AsyncBsdApi
+from bsdapi.AsyncBsdApi import Factory
+from bsdapi.ApiResult import ApiResult
+from urllib.parse import urlparse
+from urllib.parse import parse_qs
+import pytest
+
+API_ID = 'my-id'
+API_SECRET = 'my-secret'
+API_HOST = 'my.client'
+
+
+@pytest.fixture
+def api_client():
+    """
+    :return: AsyncBsdApi
+    """
+    client = Factory().create(API_ID, API_SECRET, API_HOST, 80, 443, maxConcurrency=10)
+    yield client
+    client.close()
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_mirrors_bsd_api_methods():
+    for name in ['cons_getConstituentsById', 'cons_group_addConsIdsToGroup', 'mailer_sendTriggeredEmail',
+                 'getDeferredResults', 'doRequest', 'doRawRequest']:
+        assert hasattr(AsyncBsdApi, name)
+
+
+def test_call_returns_api_result(api_client):
+    with requests_mock.Mocker() as m:
+        m.register_uri('GET', 'https://my.client/page/api/cons/get_constituents_by_id',
+                       additional_matcher=lambda req: parse_qs(urlparse(req.url).query)['cons_ids'] == ['1,2'],
+                       text='<api/>')
+
+        result = run(api_client.cons_getConstituentsById([1, 2]))
+
+    assert isinstance(result, ApiResult)
+    assert result.http_status == 200
+    assert result.body == '<api/>'
+
+
+def test_concurrent_calls(api_client):
+    """
+    Many calls can be awaited together
+    """
+    with requests_mock.Mocker() as m:
+        m.register_uri('GET', 'https://my.client/page/api/mailer/send_triggered_email')
+
+        async def send_all():
+            return await asyncio.gather(*[api_client.mailer_sendTriggeredEmail(1, 'a%d@b.c' % i) for i in range(25)])
+
+        results = run(send_all())
+
+    assert m.call_count == 25
+    assert all(result.http_status == 200 for result in results)
@@ -559,3 +559,49 @@ def test_wrappers_list_wrappers(api_client):
 
         result = api_client.wrappers_listWrappers()
         assert result.http_status == 200
+
+
+def test_session_is_reused_across_calls(api_client):
+    """
+    Every call goes through the same pooled session, so connections are kept alive between calls
+    """
+    session = api_client.session
+    with requests_mock.Mocker() as m:
+        m.register_uri('GET', 'https://my.client/page/api/cons/list_datasets')
+        m.register_uri('GET', 'https://my.client/page/api/signup/list_forms')
+
+        api_client.cons_listDatasets()
+        api_client.signup_listForms()
+
+        assert m.call_count == 2
+    assert api_client.session is session
+
+
+def test_session_pool_configuration():
+    """
+    The factory mounts a pooled adapter sized as requested for both protocols
+    """
+    api_client = Factory().create(API_ID, API_SECRET, API_HOST, 80, 443, poolConnections=3, poolMaxSize=25)
+    adapter = api_client.session.get_adapter('https://my.client/')
+    assert adapter._pool_connections == 3
+    assert adapter._pool_maxsize == 25
+    assert api_client.session.get_adapter('http://my.client/') is adapter
+
+
+def test_context_manager_closes_owned_session():
+    api_client = Factory().create(API_ID, API_SECRET, API_HOST, 80, 443)
+    with patch.object(api_client.session, 'close') as close:
+        with api_client:
+            pass
+    close.assert_called_once_with()
+    assert api_client.session is None
+
+
+def test_close_leaves_shared_session_open():
+    """
+    A session handed in by the caller is not closed along with the client
+    """
+    session = Mock()
+    api_client = BsdApi(API_ID, API_SECRET, API_HOST, ApiResultFactoryFactory().create(None), session=session)
+    api_client.close()
+    session.close.assert_not_called()
@@ -0,0 +1,72 @@
+import requests_mock
+import pytest
+from urllib.parse import urlparse
+from urllib.parse import parse_qs
+from bsdapi.BsdApi import Factory
+from bsdapi.Chunking import Chunker
+from bsdapi.Chunking import ChunkedApiResult
+
+API_ID = 'my-id'
+API_SECRET = 'my-secret'
+API_HOST = 'my.client'
+
+
+def test_split_by_count():
+    assert list(Chunker(maxCount=2).split([1, 2, 3, 4, 5])) == ['1,2', '3,4', '5']
+
+
+def test_split_by_encoded_bytes():
+    """
+    Each comma costs three bytes once URL-encoded
+    """
+    assert list(Chunker(maxBytes=7).split([11, 22, 33, 44])) == ['11,22', '33,44']
+    assert list(Chunker(maxBytes=6).split([11, 22, 33])) == ['11', '22', '33']
+
+
+def test_split_without_limits():
+    assert list(Chunker().split(range(1000))) == [','.join(str(x) for x in range(1000))]
+
+
+def test_oversized_single_id_still_sent():
+    assert list(Chunker(maxBytes=2).split(['12345'])) == ['12345']
+
+
+def test_small_lists_return_plain_result():
+    api_client = Factory().create(API_ID, API_SECRET, API_HOST, 80, 443, chunkSize=10)
+    with requests_mock.Mocker() as m:
+        m.register_uri('GET', 'https://my.client/page/api/cons/get_constituents_by_id', text='<api/>')
+        result = api_client.cons_getConstituentsById([1, 2, 3])
+
+    assert not isinstance(result, ChunkedApiResult)
+    assert m.call_count == 1
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_get_constituents_by_id_is_chunked_and_merged(workers):
+    api_client = Factory().create(API_ID, API_SECRET, API_HOST, 80, 443, chunkSize=2, chunkWorkers=workers)
+
+    def respond(request, context):
+        ids = parse_qs(urlparse(request.url).query)['cons_ids'][0].split(',')
+        return '<api>%s</api>' % ''.join('<cons id="%s"/>' % cons_id for cons_id in ids)
+
+    with requests_mock.Mocker() as m:
+        m.register_uri('GET', 'https://my.client/page/api/cons/get_constituents_by_id', text=respond)
+        result = api_client.cons_getConstituentsById([1, 2, 3, 4, 5], bundles=['cons_email'])
+
+    assert m.call_count == 3
+    assert result.ok
+    assert [chunk for chunk, _ in result.results] == ['1,2', '3,4', '5']
+    assert result.body == '<api><cons id="1" /><cons id="2" /><cons id="3" /><cons id="4" /><cons id="5" /></api>'
+
+
+def test_chunk_failures_are_reported():
+    api_client = Factory().create(API_ID, API_SECRET, API_HOST, 80, 443, chunkSize=2)
+    with requests_mock.Mocker() as m:
+        m.register_uri('POST', 'https://my.client/page/api/cons_group/add_cons_ids_to_group',
+                       [{'status_code': 200}, {'status_code': 500}])
+        result = api_client.cons_group_addConsIdsToGroup(7, [1, 2, 3])
+
+    assert not result.ok
+    assert result.http_status == 500
+    assert [chunk for chunk, _ in result.failed()] == ['3']
+    assert all('cons_group_id=7' in request.text for request in m.request_history)
@@ -0,0 +1,113 @@
+import requests_mock
+import pytest
+from urllib.parse import urlparse
+from urllib.parse import parse_qs
+from bsdapi.BsdApi import Factory
+from bsdapi.Deferred import Backoff
+from bsdapi.Deferred import DeferredPoller
+from bsdapi.Deferred import DeferredTimeoutError
+
+API_ID = 'my-id'
+API_SECRET = 'my-secret'
+API_HOST = 'my.client'
+DEFERRED_URL = 'https://my.client/page/api/get_deferred_results'
+
+
+@pytest.fixture
+def api_client():
+    """
+    :return: BsdApi
+    """
+    client = Factory().create(API_ID, API_SECRET, API_HOST, 80, 443)
+    client.deferredPoller.backoff = Backoff(initial=0.001, maximum=0.01)
+    yield client
+    client.close()
+
+
+def deferred_id_matcher(deferred_id):
+    return lambda request: parse_qs(urlparse(request.url).query)['deferred_id'] == [deferred_id]
+
+
+def test_backoff_is_capped():
+    backoff = Backoff(initial=1, maximum=10, multiplier=2, jitter=0)
+    assert [backoff.delay(attempt) for attempt in range(6)] == [1, 2, 4, 8, 10, 10]
+
+
+def test_backoff_jitter_stays_below_base():
+    backoff = Backoff(initial=4, maximum=10, jitter=0.5)
+    assert all(2 <= backoff.delay(0) <= 4 for _ in range(50))
+
+
+def test_backoff_honors_server_hint():
+    backoff = Backoff(initial=1, maximum=10, jitter=0)
+    assert backoff.delay(0, hint=7) == 7
+    assert backoff.delay(0, hint=70) == 10
+
+
+def test_wait_polls_until_ready(api_client):
+    with requests_mock.Mocker() as m:
+        m.register_uri('GET', DEFERRED_URL, [{'status_code': 503}, {'status_code': 503},
+                                             {'status_code': 200, 'text': 'done'}])
+
+        result = api_client.waitForDeferredResults('abc')
+
+    assert result.http_status == 200
+    assert result.body == 'done'
+    assert m.call_count == 3
+
+
+def test_wait_accepts_deferred_api_result(api_client):
+    with requests_mock.Mocker() as m:
+        m.register_uri('POST', 'https://my.client/page/api/cons/get_bulk_constituent_data', status_code=202,
+                       text='d123\n')
+        m.register_uri('GET', DEFERRED_URL, additional_matcher=deferred_id_matcher('d123'), text='csv')
+
+        result = api_client.waitForDeferredResults(api_client.cons_getBulkConstituentData('csv', ['firstname']))
+
+    assert result.body == 'csv'
+
+
+def test_wait_returns_results_that_were_not_deferred(api_client):
+    with requests_mock.Mocker() as m:
+        m.register_uri('GET', 'https://my.client/page/api/cons/get_constituents', text='<api/>')
+        immediate = api_client.cons_getConstituents({'state_cd': 'NY'})
+
+        assert api_client.waitForDeferredResults(immediate) is immediate
+        assert m.call_count == 1
+
+
+def test_many_ids_are_tracked_together(api_client):
+    with requests_mock.Mocker() as m:
+        m.register_uri('GET', DEFERRED_URL, additional_matcher=deferred_id_matcher('slow'),
+                       response_list=[{'status_code': 503}] * 3 + [{'text': 'slow'}])
+        m.register_uri('GET', DEFERRED_URL, additional_matcher=deferred_id_matcher('fast'), text='fast')
+
+        slow = api_client.deferredPoller.submit('slow')
+        fast = api_client.deferredPoller.submit('fast')
+
+        assert fast.result(5).body == 'fast'
+        assert slow.result(5).body == 'slow'
+    assert api_client.deferredPoller.pending() == 0
+
+
+def test_deadline_raises_timeout(api_client):
+    with requests_mock.Mocker() as m:
+        m.register_uri('GET', DEFERRED_URL, status_code=503)
+
+        with pytest.raises(DeferredTimeoutError) as info:
+            api_client.waitForDeferredResults('never', timeout=0.05)
+
+    assert info.value.deferred_id == 'never'
+    assert info.value.result.http_status == 503
+
+
+def test_close_cancels_outstanding_ids(api_client):
+    poller = DeferredPoller(api_client, Backoff(initial=60))
+    with requests_mock.Mocker() as m:
+        m.register_uri('GET', DEFERRED_URL, status_code=503)
+        future = poller.submit('abc')
+        while m.call_count == 0:
+            pass
+        poller.close()
+
+    assert future.cancelled()
@@ -0,0 +1,106 @@
+import requests_mock
+import pytest
+from urllib.parse import urlparse
+from urllib.parse import parse_qs
+from bsdapi.BsdApi import Factory
+from bsdapi.Sync import ConstituentSync
+from bsdapi.Sync import FileCheckpoint
+from bsdapi.Sync import SqliteCheckpoint
+from bsdapi.Sync import SyncError
+from freezegun import freeze_time
+
+API_ID = 'my-id'
+API_SECRET = 'my-secret'
+API_HOST = 'my.client'
+UPDATED_URL = 'https://my.client/page/api/cons/get_updated_constituents'
+DEFERRED_URL = 'https://my.client/page/api/get_deferred_results'
+CONS_XML = '<api><cons id="1"><firstname>Ann</firstname></cons><cons id="2"><firstname>Bo</firstname></cons></api>'
+
+
+@pytest.fixture
+def api_client():
+    """
+    :return: BsdApi
+    """
+    client = Factory().create(API_ID, API_SECRET, API_HOST, 80, 443)
+    client.deferredPoller.backoff.initial = 0.001
+    yield client
+    client.close()
+
+
+@pytest.fixture(params=['file', 'sqlite'])
+def checkpoint(request, tmpdir):
+    if request.param == 'file':
+        return FileCheckpoint(str(tmpdir.join('sync.json')))
+    return SqliteCheckpoint(str(tmpdir.join('sync.db')), 'nightly')
+
+
+def changed_since(request):
+    return parse_qs(urlparse(request.url).query)['changed_since'][0]
+
+
+def test_checkpoint_round_trip(checkpoint):
+    assert checkpoint.load() == {}
+    checkpoint.save({'changed_since': 5})
+    assert checkpoint.load() == {'changed_since': 5}
+
+
+@freeze_time('2001-09-09 01:46:40')
+def test_run_yields_records_and_advances_mark(api_client, checkpoint):
+    with requests_mock.Mocker() as m:
+        m.register_uri('GET', UPDATED_URL, status_code=202, text='d1')
+        m.register_uri('GET', DEFERRED_URL, text=CONS_XML)
+
+        records = list(ConstituentSync(api_client, checkpoint, bundles=['cons_email']).run())
+
+        assert changed_since(m.request_history[0]) == '0'
+
+    assert [record.get('id') for record in records] == ['1', '2']
+    assert records[1].find('firstname').text == 'Bo'
+    assert checkpoint.load() == {'changed_since': 1000000000}
+
+
+def test_run_starts_from_saved_mark(api_client, checkpoint):
+    checkpoint.save({'changed_since': 12345})
+    with requests_mock.Mocker() as m:
+        m.register_uri('GET', UPDATED_URL, text='<api/>')
+
+        assert list(ConstituentSync(api_client, checkpoint).run()) == []
+        assert changed_since(m.request_history[0]) == '12345'
+
+
+def test_interrupted_run_resumes_deferred_result(api_client, checkpoint):
+    with requests_mock.Mocker() as m:
+        m.register_uri('GET', UPDATED_URL, status_code=202, text='d1')
+        m.register_uri('GET', DEFERRED_URL, text=CONS_XML)
+
+        records = ConstituentSync(api_client, checkpoint).run()
+        next(records)
+        records.close()
+
+        assert checkpoint.load()['pending']['deferred_id'] == 'd1'
+
+        resumed = list(ConstituentSync(api_client, checkpoint).run())
+
+        assert len(resumed) == 2
+        assert [request.url.split('?')[0] for request in m.request_history].count(UPDATED_URL) == 1
+    assert 'pending' not in checkpoint.load()
+
+
+def test_expired_deferred_result_restarts_pull(api_client, checkpoint):
+    checkpoint.save({'changed_since': 77, 'pending': {'started_at': 88, 'deferred_id': 'gone'}})
+    with requests_mock.Mocker() as m:
+        m.register_uri('GET', DEFERRED_URL, status_code=404)
+        m.register_uri('GET', UPDATED_URL, text=CONS_XML)
+
+        assert len(list(ConstituentSync(api_client, checkpoint).run())) == 2
+        assert changed_since(m.request_history[-1]) == '77'
+
+
+def test_failed_pull_raises(api_client, checkpoint):
+    with requests_mock.Mocker() as m:
+        m.register_uri('GET', UPDATED_URL, status_code=500)
+
+        with pytest.raises(SyncError):
+            list(ConstituentSync(api_client, checkpoint).run())
+    assert checkpoint.load() == {}